@@ -8,17 +8,29 @@ result.
 
 from __future__ import annotations
 
+import os
+
+import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-from scipy.stats import spearmanr
 from timple.timedelta import strftimedelta
 
 import fastf1
 import fastf1.plotting
-from fastf1.core import Laps
+from fastf1.core import (
+    Lap,
+    Laps,
+)
 
 fastf1.Cache.enable_cache("./.fastf1cache")
 
+# In batch mode (FASTF1_BATCH=1), figures are saved to files instead of being
+# shown, so that the script does not block on interactive plot windows
+BATCH_MODE = os.environ.get("FASTF1_BATCH") == "1"
+if BATCH_MODE:
+    matplotlib.use("Agg")
+
 # Enable Matplotlib patches for plotting timedelta values
 fastf1.plotting.setup_mpl(
     mpl_timedelta_support=True,
@@ -28,23 +40,40 @@ fastf1.plotting.setup_mpl(
 
 SEASON = 2024
 SESSIONS_TO_COMPARE = ["FP1", "FP2", "FP3", "Q"]
+# Sessions of the first event, loaded for plotting and reused once by the
+# season evaluation
+_session_cache: dict[tuple, fastf1.core.Session] = {}
 
 
-def fastest_lap_info(session: fastf1.core.Session) -> tuple[Laps, pd.Series, list[str]]:
+def fastest_lap_info(
+        session: fastf1.core.Session
+) -> tuple[Laps, Lap, list[str]]:
     """Return fastest laps and pole information for plotting."""
-    drivers = pd.unique(session.laps["Driver"])
-    list_fastest_laps = [
-        session.laps.pick_drivers(drv).pick_fastest() for drv in drivers
-    ]
+    # same selection as ``Laps.pick_fastest``: only personal best laps are
+    # considered, but all drivers are handled in a single pass; only the
+    # lap times are sorted, the first lap of each driver in this order is
+    # their fastest lap and the full lap data is then taken in one slice
+    laps = session.laps
+    valid = (
+        (laps["IsPersonalBest"] == True)  # noqa: E712
+        & laps["LapTime"].notna()
+    )
+    sorted_times = laps["LapTime"][valid].sort_values(kind="stable")
+    is_fastest = ~laps["Driver"].loc[sorted_times.index].duplicated()
     fastest_laps = (
-        Laps(list_fastest_laps).sort_values(by="LapTime").reset_index(drop=True)
+        laps.loc[sorted_times.index[is_fastest.to_numpy()]]
+        .reset_index(drop=True)
     )
-    pole_lap = fastest_laps.pick_fastest()
-    fastest_laps["LapTimeDelta"] = fastest_laps["LapTime"] - pole_lap["LapTime"]
-    team_colors = [
-        fastf1.plotting.get_team_color(lap["Team"], session=session)
-        for _, lap in fastest_laps.iterlaps()
-    ]
+    pole_lap = fastest_laps.iloc[0]
+    lap_times = fastest_laps["LapTime"].to_numpy()
+    fastest_laps["LapTimeDelta"] = lap_times - lap_times[0]
+    # look up each team's color only once
+    teams = fastest_laps["Team"].to_numpy()
+    color_map = {
+        team: fastf1.plotting.get_team_color(team, session=session)
+        for team in pd.unique(teams)
+    }
+    team_colors = [color_map[team] for team in teams]
     return fastest_laps, pole_lap, team_colors
 
 
@@ -67,75 +96,111 @@ def plot_session(session: fastf1.core.Session) -> None:
     ax.xaxis.grid(True, which="major", linestyle="--", color="black", zorder=-1000)
 
     lap_time_string = strftimedelta(pole_lap["LapTime"], "%m:%s.%ms")
-    plt.suptitle(
+    fig.suptitle(
         f"{session.event['EventName']} {session.event.year} {session.name}\n"
         f"Fastest Lap: {lap_time_string} ({pole_lap['Driver']})"
     )
-    plt.show()
+    if BATCH_MODE:
+        fig.savefig(f"{session.event.year} {session.event['EventName']} "
+                    f"{session.name}.png", dpi=100)
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+def get_loaded_session(year: int, gp: str, name: str, keep: bool = False,
+                       **load_kwargs) -> fastf1.core.Session:
+    """Return a loaded session, keeping it for one later reuse if ``keep``."""
+    key = (year, gp, name, tuple(sorted(load_kwargs.items())))
+    session = _session_cache.pop(key, None)
+    if session is None:
+        session = fastf1.get_session(year, gp, name)
+        session.load(**load_kwargs)
+    if keep:
+        _session_cache[key] = session
+    return session
 
 
 def session_result_order(session: fastf1.core.Session) -> pd.Index:
-    """Return driver order by fastest lap."""
-    session.load(laps=True, telemetry=False, weather=False, messages=False)
-    fastest = session.laps.pick_fastest("Driver")
-    return fastest.set_index("Driver")["LapTime"].sort_values().index
+    """Return driver order by fastest personal best lap."""
+    laps = session.laps
+    laps = laps.loc[laps["IsPersonalBest"] == True]  # noqa: E712
+    fastest = laps["LapTime"].groupby(laps["Driver"], sort=False).min()
+    return fastest.dropna().sort_values().index
 
 
 def race_result_order(session: fastf1.core.Session) -> pd.Index:
     """Return finishing order of a race."""
-    session.load(laps=False, telemetry=False, weather=False, messages=False)
     return session.results.sort_values("Position")["Abbreviation"].reset_index(
         drop=True
     )
 
 
-def evaluate_event(event: pd.Series) -> pd.DataFrame:
+def evaluate_event(event: pd.Series) -> list[dict]:
     """Calculate correlation coefficients for one race weekend."""
-    race = fastf1.get_session(SEASON, event["EventName"], "R")
-    race_order = race_result_order(race)
-
-    data = []
+    try:
+        race = get_loaded_session(SEASON, event["EventName"], "R",
+                                  laps=False, telemetry=False,
+                                  weather=False, messages=False)
+        race_order = race_result_order(race).tolist()
+    except Exception as exc:  # pragma: no cover - data may be missing
+        print(f"Skipping {event['EventName']}: {exc}")
+        return []
+
+    rows = []
     for name in SESSIONS_TO_COMPARE:
         try:
-            sess = fastf1.get_session(SEASON, event["EventName"], name)
+            sess = get_loaded_session(SEASON, event["EventName"], name,
+                                      laps=True, telemetry=False,
+                                      weather=False, messages=False)
             order = session_result_order(sess)
         except Exception as exc:  # pragma: no cover - data may be missing
             print(f"Skipping {name} for {event['EventName']}: {exc}")
             continue
 
-        common = race_order[race_order.isin(order)]
-        prac_idx = order.get_indexer(common)
-        race_idx = range(len(common))
-        corr, _ = spearmanr(prac_idx, race_idx)
-        data.append({"session": name, "correlation": corr})
+        # Spearman's rank correlation in closed form, as the race order is
+        # simply 0..n-1
+        order_pos = {drv: i for i, drv in enumerate(order)}
+        prac_idx = [order_pos[drv] for drv in race_order if drv in order_pos]
+        n = len(prac_idx)
+        d = np.argsort(np.argsort(prac_idx)) - np.arange(n)
+        corr = 1 - 6 * (d * d).sum() / (n * (n * n - 1)) if n > 1 else np.nan
+        rows.append({"Event": event["EventName"], "session": name,
+                     "correlation": corr})
 
-    return pd.DataFrame(data)
+    return rows
 
 
 def main() -> None:
     schedule = fastf1.get_event_schedule(SEASON)
+    # index the schedule by round once instead of scanning it for each
+    # round; testing events all share round 0 and are excluded
+    sched_by_rnd = (
+        schedule[schedule["RoundNumber"] > 0].set_index("RoundNumber")
+    )
 
-    # Plot an example for the first event
-    first_event = schedule.iloc[0]["EventName"]
+    # Plot an example for the first event; its sessions are kept so that
+    # the season evaluation does not load them again
+    first_event = sched_by_rnd.iloc[0]["EventName"]
     for sess_name in SESSIONS_TO_COMPARE:
-        sess = fastf1.get_session(SEASON, first_event, sess_name)
-        sess.load()
+        sess = get_loaded_session(SEASON, first_event, sess_name, keep=True,
+                                  laps=True, telemetry=False,
+                                  weather=False, messages=False)
         plot_session(sess)
 
     # Evaluate predictive value for the full season
-    result_list = []
+    all_rows = []
     for rnd in range(1, 25):
-        ev = schedule[schedule["RoundNumber"] == rnd]
-        if ev.empty:
+        if rnd not in sched_by_rnd.index:
             print(f"Round {rnd} not found in schedule")
             continue
-        ev = ev.iloc[0]
+        ev = sched_by_rnd.loc[rnd]
         print(f"Processing {ev['EventName']}")
-        res = evaluate_event(ev)
-        res.insert(0, "Event", ev["EventName"])
-        result_list.append(res)
+        all_rows.extend(evaluate_event(ev))
 
-    season_results = pd.concat(result_list, ignore_index=True)
+    season_results = pd.DataFrame(
+        all_rows, columns=["Event", "session", "correlation"]
+    )
     avg = season_results.groupby("session").mean(numeric_only=True)
     print(season_results)
     print("\nAverage correlations:\n", avg)
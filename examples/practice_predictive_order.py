@@ -16,8 +16,8 @@ future use.
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
-from scipy.stats import spearmanr
 
 import fastf1
 from fastf1.core import Laps
@@ -27,19 +27,41 @@ fastf1.Cache.enable_cache("./.fastf1cache")
 
 
 SEASON = 2023
+RESULT_COLUMNS = ["Event", "session", "qualifying", "race"]
 
 
-def filter_meaningful(laps: Laps, q_avg: pd.Timedelta) -> Laps:
+def mean_lap_time(laps: Laps) -> np.timedelta64:
+    """Return the mean lap time, or NaT if no lap has a lap time."""
+    # average the nanosecond values directly; NaT is stored as the smallest
+    # int64 and is therefore excluded together with any non-positive value
+    values = laps["LapTime"].to_numpy().view("i8")
+    values = values[values > 0]
+    if not values.size:
+        return np.timedelta64("NaT", "ns")
+    return np.timedelta64(int(values.mean()), "ns")
+
+
+def filter_meaningful(laps: Laps, q_avg: np.timedelta64) -> Laps:
     """Filter laps slower than 120% of the average qualifying lap time."""
     threshold = q_avg * 1.20
-    return laps[laps["LapTime"] <= threshold]
+    # compare the raw timedelta64 values, a NaT threshold or lap time never
+    # passes the filter
+    mask = laps["LapTime"].to_numpy() <= threshold
+    return laps.iloc[mask]
 
 
-def session_fast_laps(session: fastf1.core.Session, q_avg: pd.Timedelta) -> pd.Series:
+def session_fast_laps(session: fastf1.core.Session,
+                      q_avg: np.timedelta64) -> pd.Series:
     """Return fastest meaningful lap time per driver."""
     laps = filter_meaningful(session.laps, q_avg)
-    fastest = laps.pick_fastest("Driver")
-    return fastest.set_index("Driver")["LapTime"].sort_values()
+    return fastest_lap_times(laps)
+
+
+def fastest_lap_times(laps: Laps) -> pd.Series:
+    """Return the fastest personal best lap time per driver, sorted."""
+    laps = laps.loc[laps["IsPersonalBest"] == True]  # noqa: E712
+    fastest = laps["LapTime"].groupby(laps["Driver"], sort=False).min()
+    return fastest.dropna().sort_values()
 
 
 def classification_order(session: fastf1.core.Session, column: str) -> pd.Index:
@@ -51,54 +73,60 @@ def classification_order(session: fastf1.core.Session, column: str) -> pd.Index:
     )
 
 
-def evaluate_event(year: int, gp: str) -> pd.DataFrame:
+def evaluate_event(year: int, gp: str) -> list[tuple]:
     """Calculate correlation coefficients for one race weekend."""
     fp2 = fastf1.get_session(year, gp, "FP2")
     fp3 = fastf1.get_session(year, gp, "FP3")
     quali = fastf1.get_session(year, gp, "Q")
     race = fastf1.get_session(year, gp, "R")
 
-    fp2.load(); fp3.load(); quali.load(); race.load()
+    # only lap timing data and results are needed, skip everything else
+    fp2.load(laps=True, telemetry=False, weather=False, messages=False)
+    fp3.load(laps=True, telemetry=False, weather=False, messages=False)
+    quali.load(laps=True, telemetry=False, weather=False, messages=False)
+    race.load(laps=False, telemetry=False, weather=False, messages=False)
 
-    q_avg = quali.laps["LapTime"].mean()
+    q_avg = mean_lap_time(quali.laps)
 
     practice = {
         "FP2": session_fast_laps(fp2, q_avg),
         "FP3": session_fast_laps(fp3, q_avg),
     }
-    quali_order = classification_order(quali, "QFPosition")
-    race_order = classification_order(race, "Position")
+    quali_order = classification_order(quali, "QFPosition").tolist()
+    race_order = classification_order(race, "Position").tolist()
 
-    data = []
+    rows = []
     for name, laps in practice.items():
-        common_q = quali_order[quali_order.isin(laps.index)]
-        prac_q = laps.index.get_indexer(common_q)
-        corr_q, _ = spearmanr(prac_q, range(len(prac_q)))
-
-        common_r = race_order[race_order.isin(laps.index)]
-        prac_r = laps.index.get_indexer(common_r)
-        corr_r, _ = spearmanr(prac_r, range(len(prac_r)))
+        # the practice order is shared by both comparisons
+        prac_pos = {drv: i for i, drv in enumerate(laps.index)}
+        corrs = []
+        for order in (quali_order, race_order):
+            # Spearman's rank correlation in closed form, as the reference
+            # order is simply 0..n-1
+            prac_idx = [prac_pos[drv] for drv in order if drv in prac_pos]
+            n = len(prac_idx)
+            d = np.argsort(np.argsort(prac_idx)) - np.arange(n)
+            corrs.append(1 - 6 * (d * d).sum() / (n * (n * n - 1))
+                         if n > 1 else np.nan)
 
-        data.append({"session": name, "qualifying": corr_q, "race": corr_r})
+        rows.append((gp, name, *corrs))
 
-    return pd.DataFrame(data)
+    return rows
 
 
 def analyze_season(year: int = SEASON) -> pd.DataFrame:
     """Evaluate all rounds of a season."""
     schedule = fastf1.get_event_schedule(year)
-    result_list = []
+    rows = []
 
     for gp in schedule.EventName:
         try:
-            res = evaluate_event(year, gp)
+            rows.extend(evaluate_event(year, gp))
         except Exception as exc:  # pragma: no cover - depends on data availability
             print(f"Skipping {gp}: {exc}")
             continue
-        res.insert(0, "Event", gp)
-        result_list.append(res)
 
-    return pd.concat(result_list, ignore_index=True)
+    return pd.DataFrame.from_records(rows, columns=RESULT_COLUMNS)
 
 
 def main() -> None: